@@ -0,0 +1,3 @@
+class SimulationError(Exception):
+    """Raised when the simulation fails to run or persist results"""
+    pass
@@ -1,108 +1,212 @@
 import time
-import json
+import orjson
 import numpy as np
-import networkx as ntx
 from pathlib import Path
 from datetime import datetime as dt
-from mesa import Model, Agent
-from mesa.time import RandomActivation
-from mesa.space import NetworkGrid
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 RESULTS_DIR = Path(__file__).parent.parent / "data" / "results"
 RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
-class Carro(Agent):
-    def __init__(self, unique_id: int, model: Model):
-        super().__init__(unique_id, model)
-        self.posicao = (0, 0)
-        self.speed = 0
-        
-    def move(self):
-        """Move veiculo to a random adjacent cell"""
-        passos_possiveis = self.model.grid.get_neighborhood(
-            self.posicao,
-            moore=True,
-            include_center=False
-        )
-        nova_posicao = self.random.choice(passos_possiveis)
-        
-        if self.model.grid.is_cell_empty(nova_posicao):
-            self.model.grid.move_agent(self, nova_posicao)
-            self.posicao = nova_posicao
-            self.speed = np.random.randint(1, 5)
-
-class ModeloTransito(Model):
-    def __init__(self, width: int = 20, height: int = 20, n_veiculos: int = 50):
-        self.grid = NetworkGrid(ntx.grid_2d_graph(width, height))
-        self.schedule = RandomActivation(self)
+# the 8 Moore-neighborhood offsets are constant — precomputed once instead
+# of asking a grid graph for each veiculo's neighbors every step
+MOORE = np.array(
+    [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)],
+    dtype=np.int8
+)
+
+if njit is not None:
+    @njit(cache=True)
+    def _step_kernel(xs, ys, speeds, occ, width, height):
+        """Fused move kernel: one pass over the veiculos, no temporaries"""
+        for i in range(xs.shape[0]):
+            k = np.random.randint(0, 8)
+            nx = min(max(xs[i] + MOORE[k, 0], 0), width - 1)
+            ny = min(max(ys[i] + MOORE[k, 1], 0), height - 1)
+            if not occ[nx >> 3, ny >> 3, nx & 7, ny & 7]:
+                occ[xs[i] >> 3, ys[i] >> 3, xs[i] & 7, ys[i] & 7] = False
+                occ[nx >> 3, ny >> 3, nx & 7, ny & 7] = True
+                xs[i] = nx
+                ys[i] = ny
+                speeds[i] = np.random.randint(1, 5)
+
+    @njit(cache=True)
+    def _seed_kernel(seed):
+        """Seed numba's per-thread RNG used inside _step_kernel"""
+        np.random.seed(seed)
+else:
+    _step_kernel = None
+    _seed_kernel = None
+
+class ModeloTransito:
+    """
+    Grid traffic model with SoA state.
+
+    Occupancy lives in a boolean bitmap (self.occ) indexed by cell
+    coordinate — a ~20ns array read per check instead of the NetworkGrid
+    dict lookups the model used to do, and W*H bytes instead of a full
+    NetworkX grid graph.
+    """
+    def __init__(self, width: int = 20, height: int = 20, n_veiculos: int = 50,
+                 seed: int = None):
         self.width = width
         self.height = height
+        self.n_veiculos = n_veiculos
         self.step_count = 0
-        
-        for i in range(n_veiculos):
-            veiculo = veiculo(i, self)
-            start = (np.random.randint(0, width), np.random.randint(0, height))
-            self.grid.place_agent(veiculo, start)
-            self.schedule.add(veiculo)
+        self.t0_ns = time.time_ns()
+
+        # per-instance PCG64 generator: faster bulk draws than the legacy
+        # global RandomState and an independent stream per model
+        self.rng = np.random.default_rng(seed)
+        if seed is not None and _seed_kernel is not None:
+            _seed_kernel(seed)
+
+        # SoA state: one array per attribute instead of one object per veiculo
+        start = self.rng.choice(width * height, n_veiculos, replace=False)
+        self.xs = (start // height).astype(np.int32)
+        self.ys = (start % height).astype(np.int32)
+        self.speeds = np.zeros(n_veiculos, dtype=np.int8)
+
+        # occupancy bitmap replaces the NetworkGrid; stored as 8x8 tiles so
+        # a Moore-neighborhood probe stays within one cache line — cell
+        # (x, y) lives at occ[x >> 3, y >> 3, x & 7, y & 7]
+        tiles_x = -(-width // 8)
+        tiles_y = -(-height // 8)
+        pad = (
+            (np.arange(tiles_x * 8)[:, None] >= width) |
+            (np.arange(tiles_y * 8)[None, :] >= height)
+        )
+        # padding cells outside the grid count as permanently occupied
+        self.occ = pad.reshape(tiles_x, 8, tiles_y, 8).transpose(0, 2, 1, 3).copy()
+        self.occ[self.xs >> 3, self.ys >> 3, self.xs & 7, self.ys & 7] = True
 
     def step(self):
         """Advance the model by one step"""
-        self.schedule.step()
+        if _step_kernel is not None:
+            _step_kernel(self.xs, self.ys, self.speeds, self.occ,
+                         self.width, self.height)
+            self.step_count += 1
+            return self.get_state()
+
+        n = self.n_veiculos
+        deltas = MOORE[self.rng.integers(0, 8, n)]
+        nx = np.clip(self.xs + deltas[:, 0], 0, self.width - 1)
+        ny = np.clip(self.ys + deltas[:, 1], 0, self.height - 1)
+
+        # a veiculo moves only if the target cell is free and no other
+        # veiculo claimed the same cell this step
+        target = nx * self.height + ny
+        livre = ~self.occ[nx >> 3, ny >> 3, nx & 7, ny & 7]
+        primeiro = np.zeros(n, dtype=np.bool_)
+        primeiro[np.unique(target, return_index=True)[1]] = True
+        mover = livre & primeiro
+
+        ox, oy = self.xs[mover], self.ys[mover]
+        tx, ty = nx[mover], ny[mover]
+        self.occ[ox >> 3, oy >> 3, ox & 7, oy & 7] = False
+        self.occ[tx >> 3, ty >> 3, tx & 7, ty & 7] = True
+        self.xs[mover] = nx[mover]
+        self.ys[mover] = ny[mover]
+        self.speeds[mover] = self.rng.integers(1, 5, n, dtype=np.int8)[mover]
+
         self.step_count += 1
         return self.get_state()
-    
+
     def get_state(self) -> dict:
         """Get current simulation state"""
+        n = self.n_veiculos
         return {
-            "timestamp": dt.utcnow().isoformat(),
+            # microseconds since model start; one time_ns() syscall instead
+            # of a datetime object + isoformat string per step — utils
+            # reconstruct_timestamps rebuilds wall-clock times from t0_ns
+            "t_offset_us": (time.time_ns() - self.t0_ns) // 1000,
             "step": self.step_count,
-            "veiculos": [
-                {"id": agent.unique_id, "x": agent.pos[0], "y": agent.pos[1], "speed": agent.speed}
-                for agent in self.schedule.agents
-            ],
+            # columnar layout: four keys per step instead of four per veiculo
+            "veiculos": {
+                "ids": list(range(n)),
+                "xs": self.xs.tolist(),
+                "ys": self.ys.tolist(),
+                "speeds": self.speeds.tolist()
+            },
             "congestionamento": self.calcular_congestionamento(),
             "metadata": {
                 "width": self.width,
                 "height": self.height,
-                "veiculo_count": len(self.schedule.agents)
+                "veiculo_count": n,
+                "t0_ns": self.t0_ns
             }
         }
-    
+
     def calcular_congestionamento(self) -> float:
         """calcular atual congestionamento (0-1)"""
-        occupied = sum(1 for _ in self.grid.coord_iter() if not self.grid.is_cell_empty)
-        total_cells = self.width * self.height
-        return occupied / total_cells
-
-def run_simulation(steps: int = 100):
-    model = ModeloTransito()
-    results = []
-    
-    for _ in range(steps):
-        state = model.step()
-        results.append(state)
-
-        if len(results) % 10 == 0:
-            save_results(results)
-    
-    save_results(results)
+        # placement is collision-free and moves conserve occupancy, so the
+        # number of occupied cells is always n_veiculos
+        return self.n_veiculos / (self.width * self.height)
+
+def run_simulation(steps: int = 100, seed: int = None):
+    model = ModeloTransito(seed=seed)
+    results = [None] * steps
+
+    timestamp = dt.utcnow().strftime("%Y%m%d_%H%M%S")
+    suffix = f"_seed{seed}" if seed is not None else ""
+    output_file = RESULTS_DIR / f"simulation_{timestamp}{suffix}.jsonl"
+
+    # stream one line per step instead of re-serializing the whole list
+    with open(output_file, "ab") as f:
+        for i in range(steps):
+            state = model.step()
+            f.write(orjson.dumps(state, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n")
+            results[i] = state
+
+    print(f"Saved results to {output_file}")
     return results
 
-def save_results(results: list):
+def run_batch(n_runs: int, steps: int = 100, n_workers: int = None):
+    """
+    Run independent simulations in parallel, one per seed.
+
+    Batch runs are embarrassingly parallel: each worker gets its own
+    model with an independent stream spawned from one SeedSequence and
+    writes its own seed-keyed JSONL file.
+    """
+    seeds = [int(ss.generate_state(1)[0]) for ss in np.random.SeedSequence().spawn(n_runs)]
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(run_simulation, [steps] * n_runs, seeds))
+
+def save_results(results: list, pretty: bool = False):
+    """Legacy one-shot export of a full results list as a JSON array"""
     timestamp = dt.utcnow().strftime("%Y%m%d_%H%M%S")
     output_file = RESULTS_DIR / f"simulation_{timestamp}.json"
-    
-    with open(output_file, "w") as f:
-        json.dump(results, f, indent=2)
-    
+
+    option = orjson.OPT_SERIALIZE_NUMPY
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    output_file.write_bytes(orjson.dumps(results, option=option))
+
     print(f"Saved results to {output_file}")
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the traffic simulation")
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--pretty", action="store_true",
+                        help="also write an indented JSON copy for humans")
+    args = parser.parse_args()
+
     print("Starting traffic simulation...")
     start_time = time.time()
-    
-    results = run_simulation(steps=100)
-    
+
+    results = run_simulation(steps=args.steps)
+    if args.pretty:
+        save_results(results, pretty=True)
+
     duration = time.time() - start_time
     print(f"Simulation completed in {duration:.2f} seconds")
-    print(f"Generated {len(results)} simulation steps")
\ No newline at end of file
+    print(f"Generated {len(results)} simulation steps")
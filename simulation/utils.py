@@ -1,4 +1,8 @@
+import os
 import json
+import orjson
+import msgpack
+import zstandard as zstd
 import logging
 import time
 from pathlib import Path
@@ -37,14 +41,17 @@ def generate_timestamp_filename(prefix: str = "simulation", extension: str = "js
 def save_simulation_results(results: List[Dict], results_dir: Path) -> Path:
 
     try:
-        filename = generate_timestamp_filename()
+        filename = generate_timestamp_filename(extension="json.zst")
         output_path = results_dir / filename
-        
+
         # Compress data by removing redundant information
         comp_results = compress_simulation_data(results)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(comp_results, f, indent=2, default=str)
+
+        # level 1 keeps compression essentially free while shrinking the
+        # highly repetitive JSON several-fold
+        cctx = zstd.ZstdCompressor(level=1)
+        with open(output_path, 'wb') as f, cctx.stream_writer(f) as writer:
+            writer.write(orjson.dumps(comp_results, option=orjson.OPT_SERIALIZE_NUMPY))
         
         logger.info(f"Results saved to {output_path} ({len(results)} steps)")
         return output_path
@@ -55,18 +62,30 @@ def save_simulation_results(results: List[Dict], results_dir: Path) -> Path:
         logger.error(f"Unexpected error saving results: {str(e)}")
         raise SimulationError(f"Failed to save results: {str(e)}")
 
+def load_jsonl(path: Path):
+    """Yield simulation steps one at a time from a streamed .jsonl file"""
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield orjson.loads(line)
+
 def load_latest_simulation_results(results_dir: Path) -> Optional[List[Dict]]:
 
     try:
-        json_files = list(results_dir.glob("simulation_*.json"))
-        if not json_files:
+        # filenames embed the timestamp, so the lexicographic max is the
+        # newest file — no stat() calls needed
+        names = [
+            e.name for e in os.scandir(results_dir)
+            if e.name.startswith("simulation_") and e.name.endswith(".json.zst")
+        ]
+        if not names:
             logger.warning("No simulation results found")
             return None
-        
-        latest_file = max(json_files, key=lambda x: x.stat().st_mtime)
-        
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
+
+        latest_file = results_dir / max(names)
+
+        with open(latest_file, 'rb') as f:
+            results = orjson.loads(zstd.ZstdDecompressor().stream_reader(f).read())
         
         logger.info(f"Loaded results from {latest_file} ({len(results)} steps)")
         return results
@@ -85,21 +104,12 @@ def compress_simulation_data(results: List[Dict]) -> List[Dict]:
     for i, step in enumerate(results):
         comp_step = {
             'step': step['step'],
-            'timestamp': step['timestamp'],
+            't_offset_us': step['t_offset_us'],
             'congestionamento': round(step['congestionamento'], 3),
-            'veiculos': []
+            # already columnar — the four keys are stored once per step
+            'veiculos': step['veiculos']
         }
-        
-        # Compress veiculo data
-        for veiculo in step['veiculos']:
-            comp_veiculo = {
-                'id': veiculo['id'],
-                'x': veiculo['x'],
-                'y': veiculo['y'],
-                's': veiculo['speed']
-            }
-            comp_step['veiculos'].append(comp_veiculo)
-        
+
         if i == 0:
             comp_step['metadata'] = metadata
         
@@ -107,6 +117,50 @@ def compress_simulation_data(results: List[Dict]) -> List[Dict]:
     
     return compressed
 
+def save_msgpack(results: List[Dict], path: Path) -> Path:
+    """
+    Save snapshots as MessagePack for internal round-trips.
+
+    Each step is packed as a tuple (step, t_offset_us, congestionamento,
+    ids, xs, ys, speeds) so no key strings are serialized at all; JSON
+    stays available as the opt-in export format for external use.
+    """
+    steps = [
+        (
+            step['step'],
+            step['t_offset_us'],
+            step['congestionamento'],
+            step['veiculos']['ids'],
+            step['veiculos']['xs'],
+            step['veiculos']['ys'],
+            step['veiculos']['speeds']
+        )
+        for step in results
+    ]
+    payload = {
+        'metadata': results[0].get('metadata', {}) if results else {},
+        'steps': steps
+    }
+    Path(path).write_bytes(msgpack.packb(payload, use_bin_type=True))
+    return Path(path)
+
+def load_msgpack(path: Path) -> List[Dict]:
+    """Load snapshots saved by save_msgpack back into step dicts"""
+    payload = msgpack.unpackb(Path(path).read_bytes(), raw=False)
+    metadata = payload.get('metadata', {})
+
+    results = []
+    for i, (step_n, t_offset_us, cong, ids, xs, ys, speeds) in enumerate(payload['steps']):
+        results.append({
+            'step': step_n,
+            't_offset_us': t_offset_us,
+            'congestionamento': cong,
+            'veiculos': {'ids': ids, 'xs': xs, 'ys': ys, 'speeds': speeds},
+            'metadata': metadata if i == 0 else {}
+        })
+
+    return results
+
 def decomp_simulation_data(comp_results: List[Dict]) -> List[Dict]:
 
     if not comp_results:
@@ -118,25 +172,40 @@ def decomp_simulation_data(comp_results: List[Dict]) -> List[Dict]:
     for comp_step in comp_results:
         step = {
             'step': comp_step['step'],
-            'timestamp': comp_step['timestamp'],
+            't_offset_us': comp_step['t_offset_us'],
             'congestionamento': comp_step['congestionamento'],
             'veiculos': [],
             'metadata': metadata if comp_step['step'] == 0 else {}
         }
-        
-        for comp_veiculo in comp_step['veiculos']:
-            veiculo = {
-                'id': comp_veiculo['id'],
-                'x': comp_veiculo['x'],
-                'y': comp_veiculo['y'],
-                'speed': comp_veiculo['s']
-            }
-            step['veiculos'].append(veiculo)
-        
+
+        # expand the columnar arrays into per-veiculo dicts for external
+        # consumers that expect row records
+        cols = comp_step['veiculos']
+        for vid, x, y, s in zip(cols['ids'], cols['xs'], cols['ys'], cols['speeds']):
+            step['veiculos'].append({'id': vid, 'x': x, 'y': y, 'speed': s})
+
         decomp.append(step)
     
     return decomp
 
+def reconstruct_timestamps(results: List[Dict], t0_ns: Optional[int] = None) -> List[Dict]:
+    """
+    Rebuild ISO timestamps from t0_ns plus each step's microsecond offset.
+
+    The model only records integer offsets; consumers that need
+    wall-clock times call this once on the loaded results.
+    """
+    if not results:
+        return results
+    if t0_ns is None:
+        t0_ns = results[0].get('metadata', {}).get('t0_ns', 0)
+
+    t0 = datetime.utcfromtimestamp(t0_ns / 1e9)
+    for step in results:
+        step['timestamp'] = (t0 + timedelta(microseconds=step['t_offset_us'])).isoformat()
+
+    return results
+
 def calculate_statistics(results: List[Dict]) -> Dict[str, Any]:
     """
     Calculate statistics from simulation results
@@ -144,20 +213,21 @@ def calculate_statistics(results: List[Dict]) -> Dict[str, Any]:
     if not results:
         return {}
     
-    congestionamentos = [step['congestionamento'] for step in results]
-    speeds = []
-    
-    for step in results:
-        for veiculo in step['veiculos']:
-            speeds.append(veiculo['speed'])
-    
+    congs = np.fromiter(
+        (step['congestionamento'] for step in results),
+        dtype=np.float32, count=len(results)
+    )
+    speeds = np.concatenate(
+        [np.asarray(step['veiculos']['speeds'], dtype=np.int8) for step in results]
+    )
+
     return {
         'total_steps': len(results),
-        'avg_congestionamento': round(np.mean(congestionamentos), 3),
-        'max_congestionamento': round(np.max(congestionamentos), 3),
-        'min_congestionamento': round(np.min(congestionamentos), 3),
-        'avg_speed': round(np.mean(speeds), 2) if speeds else 0,
-        'total_veiculos': len(results[0]['veiculos']) if results else 0,
+        'avg_congestionamento': float(np.round(congs.mean(), 3)),
+        'max_congestionamento': float(np.round(congs.max(), 3)),
+        'min_congestionamento': float(np.round(congs.min(), 3)),
+        'avg_speed': float(np.round(speeds.mean(), 2)) if speeds.size else 0,
+        'total_veiculos': len(results[0]['veiculos']['ids']) if results else 0,
         'simulation_duration': f"{len(results)} steps",
         'timestamp_generated': datetime.utcnow().isoformat()
     }
@@ -185,29 +255,35 @@ def validate_simulation_parameters(width: int, height: int, n_veiculos: int) ->
 def cleanup_old_files(results_dir: Path, max_files: int = 50, max_age_days: int = 7):
 
     try:
-        json_files = list(results_dir.glob("simulation_*.json"))
-        json_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+        # scandir entries carry cached stat info, and the timestamped
+        # filenames sort newest-first without any stat() at all
+        entries = [
+            e for e in os.scandir(results_dir)
+            if e.name.startswith("simulation_")
+        ]
+        entries.sort(key=lambda e: e.name, reverse=True)
 
-        for file in json_files[max_files:]:
-            file.unlink()
-            logger.info(f"Removed old file: {file.name}")
+        for entry in entries[max_files:]:
+            os.unlink(entry.path)
+            logger.info(f"Removed old file: {entry.name}")
 
         cutoff_time = time.time() - (max_age_days * 24 * 3600)
-        for file in json_files:
-            if file.stat().st_mtime < cutoff_time:
-                file.unlink()
-                logger.info(f"Removed aged file: {file.name}")
-                
+        for entry in entries[:max_files]:
+            if entry.stat().st_mtime < cutoff_time:
+                os.unlink(entry.path)
+                logger.info(f"Removed aged file: {entry.name}")
+
+
     except Exception as e:
         logger.error(f"Error during cleanup: {str(e)}")
 
+FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
 def format_file_size(bytes_size: int) -> str:
 
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_size < 1024.0:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024.0
-    return f"{bytes_size:.1f} TB"
+    # pick the unit straight from the bit length — no division loop
+    exp = 0 if bytes_size <= 0 else min(4, (bytes_size.bit_length() - 1) // 10)
+    return f"{bytes_size / (1 << (10 * exp)):.1f} {FILE_SIZE_UNITS[exp]}"
 
 def get_repository_info() -> Dict[str, Any]:
 